@@ -1,28 +1,58 @@
 import copy
+import http.cookiejar
 import json
 import logging
+import orjson
 import os
 import re
 import requests
 import time
 import yaml
 
-from functools import cached_property
+from functools import cached_property, lru_cache
 from typing import Any
-from typing import Pattern, Dict, Any, Tuple, Optional
+from typing import Pattern, Dict, Any, Tuple, Optional, Iterable, Iterator
 from urllib.parse import urljoin
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator
 from flask import Flask, request, Response, stream_with_context, g
+from flask.json.provider import DefaultJSONProvider
+from requests.adapters import HTTPAdapter
+
+# orjson silently turns integers outside the 64-bit range into floats (and
+# refuses to serialise them), so documents that may contain such integers
+# (any run of 19+ digits) are handled by the stdlib json instead.
+_LONG_DIGITS_RE = re.compile(rb"\d{19}")
+
+
+def _json_loads(s):
+    data = s.encode("utf-8", errors="surrogatepass") if isinstance(s, str) else s
+    if not _LONG_DIGITS_RE.search(data):
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # e.g. lone surrogate escapes, NaN/Infinity or 1e400, which stdlib json accepts
+    return json.loads(s)
+
+
+def _json_dumps(obj) -> bytes:
+    try:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    except TypeError:  # e.g. integers outside the 64-bit range
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
 
 
 # Configuration data structures
 class ThinkingConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     do_strip: bool = False  # all text between thinking tags will be discarded and not passed downstream
     do_split: bool = False  # all text between thinking tags will be put into "reasoning_content" instead of "content"
     tags: Tuple[str, str] = ('<think>', '</think>')
 
 class VariantConfig(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     name: str
     label: str
     model_regex: str
@@ -46,6 +76,13 @@ class AppConfig(BaseModel):
     split_token_model_name_label: str = "@"
     variants: Dict[str, VariantConfig] = {}
 
+    @cached_property
+    def variants_by_label(self) -> Dict[str, list[VariantConfig]]:
+        by_label: Dict[str, list[VariantConfig]] = {}
+        for variant in self.variants.values():
+            by_label.setdefault(variant.label, []).append(variant)
+        return by_label
+
 # Parameter type definitions
 PARAM_TYPES = {
     # Float parameters (0.0 to 1.0 typically)
@@ -71,59 +108,51 @@ PARAM_TYPES = {
     'mirostat': bool,         # Use Mirostat sampling
 }
 
-# Buffer for handling think tags across chunks
-class StreamBuffer:
-    def __init__(self, start_tag, end_tag):
-        self.buffer = ""
-        self.start_tag = start_tag
-        self.end_tag = end_tag
-
-    def process_chunk(self, chunk):
-        # Decode and add to buffer
-        decoded_chunk = chunk.decode("utf-8", errors="replace")
-        self.buffer += decoded_chunk
-
-        output = ""
-
-        while True:
-            # Find the next potential tag start
-            start = self.buffer.find(self.start_tag)
-
-            if start == -1:
-                # No more think tags, output all except last few chars
-                if len(self.buffer) > 1024: # Keep some buffer for potential partial tags at the very end
-                    output += self.buffer[:-1024]
-                    self.buffer = self.buffer[-1024:]
-                break
-
-            # Output content before the tag
-            if start > 0:
-                output += self.buffer[:start]
-                self.buffer = self.buffer[start:]
-                start = 0  # Tag is now at start of buffer
-
-            # Look for end tag
-            end = self.buffer.find(self.end_tag, start) # Search after the start tag
-            if end == -1:
-                # No end tag yet, keep in buffer (if buffer isn't excessively large)
-                if len(self.buffer) > (len(self.start_tag) + 4096): # Heuristic to prevent runaway buffer with unclosed tags
-                    # This case implies a very long segment without an end tag.
-                    # We might decide to flush part of it if it's not the start_tag itself.
-                    # For now, break and wait for more data or flush.
-                    pass # Keep in buffer
+@lru_cache(maxsize=32)
+def _think_re(start_tag: str, end_tag: str) -> Pattern:
+    """Compiled pattern matching a complete thinking block, or a dangling end tag
+    at the very start of the text (start tag already consumed by the prompt),
+    cached per tag pair."""
+    start, end = re.escape(start_tag), re.escape(end_tag)
+    return re.compile(rf"{start}[\s\S]*?{end}|\A\n*{end}")
+
+def strip_think_stream(chunks: Iterable[bytes], start_tag: bytes, end_tag: bytes) -> Iterator[bytes]:
+    """Yield the bytes of ``chunks`` with every start_tag...end_tag block removed.
+
+    Works on raw bytes, so multi-byte characters split across chunks are passed
+    through intact. Outside a block only a tail shorter than start_tag is held
+    back between chunks. An open block is held until its end tag arrives; if the
+    input ends first (e.g. the model hit max_tokens while thinking) the block is
+    emitted unchanged so that any framing following it is not lost.
+    """
+    buf = bytearray()
+    inside = False  # buf starts with a start_tag whose end_tag has not been seen yet
+    scan = 0  # offset in buf from which the end tag may still start
+    for chunk in chunks:
+        buf += chunk
+        while buf:
+            if not inside:
+                pos = buf.find(start_tag)
+                if pos == -1:
+                    # Keep just enough to complete a start tag split across chunks
+                    cut = max(len(buf) - len(start_tag) + 1, 0)
+                    if cut:
+                        yield bytes(buf[:cut])
+                        del buf[:cut]
+                    break
+                if pos:
+                    yield bytes(buf[:pos])
+                    del buf[:pos]
+                inside = True
+                scan = len(start_tag)
+            pos = buf.find(end_tag, scan)
+            if pos == -1:
+                scan = max(len(buf) - len(end_tag) + 1, len(start_tag))
                 break
-
-            # Remove the complete think tag and its content
-            end += len(self.end_tag)
-            self.buffer = self.buffer[end:]
-
-        return output.encode("utf-8") if output else b""
-
-    def flush(self):
-        # Output remaining content
-        output = self.buffer
-        self.buffer = ""
-        return output.encode("utf-8")
+            del buf[:pos + len(end_tag)]
+            inside = False
+    if buf:
+        yield bytes(buf)
 
 def convert_param_value(key: str, value: str) -> Any:
     """Convert parameter value to appropriate type based on parameter name."""
@@ -140,10 +169,28 @@ def convert_param_value(key: str, value: str) -> Any:
         return param_type(value)
     except (ValueError, TypeError):
         # If conversion fails, log warning and return original string
-        logger.warning(f"Failed to convert parameter '{key}' value '{value}' to {param_type.__name__}")
+        logger.warning("Failed to convert parameter '%s' value '%s' to %s", key, value, param_type.__name__)
         return value
 
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson (used e.g. by request.get_json)."""
+
+    def loads(self, s, **kwargs):
+        return _json_loads(s)
+
+    def dumps(self, obj, **kwargs) -> str:
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=self.default, option=option).decode("utf-8")
+        except TypeError:  # e.g. integers outside the 64-bit range
+            return super().dumps(obj, **kwargs)
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 @app.teardown_request
 def cleanup_request(exception=None):
@@ -162,9 +209,9 @@ def load_config() -> AppConfig:
         try:
             with open(config_path) as f:
                 config_data = yaml.safe_load(f) or {}
-            logger.info(f"Loaded configuration from {config_path}")
+            logger.info("Loaded configuration from %s", config_path)
         except Exception as e:
-            logger.error(f"Failed to load config from {config_path}: {str(e)}")
+            logger.error("Failed to load config from %s: %s", config_path, e)
             raise
     else:
         logger.warning("No config read, set env var COT_CONFIG to point to a yaml file.")
@@ -198,7 +245,7 @@ logger = logging.getLogger(__name__)
 try:
     config = load_config()
 except Exception as e:
-    logger.error(f"Configuration error: {str(e)}")
+    logger.error("Configuration error: %s", e)
     raise
 
 # Configure logging based on config
@@ -216,20 +263,28 @@ if TARGET_BASE_URL is None:
 if not TARGET_BASE_URL.endswith('/'):
     TARGET_BASE_URL += '/'  # Ensure trailing slash for urljoin
 
-logger.debug(f"Starting proxy with target URL: {TARGET_BASE_URL}")
-logger.debug(f"Debug mode: {log_level == logging.DEBUG}")
+# Shared session so connections to the target are pooled and kept alive.
+# Cookies are rejected so that nothing leaks between downstream clients.
+http_session = requests.Session()
+http_session.cookies.set_policy(http.cookiejar.DefaultCookiePolicy(allowed_domains=[]))
+_adapter = HTTPAdapter(pool_connections=32, pool_maxsize=64)
+http_session.mount("http://", _adapter)
+http_session.mount("https://", _adapter)
+
+logger.debug("Starting proxy with target URL: %s", TARGET_BASE_URL)
+logger.debug("Debug mode: %s", log_level == logging.DEBUG)
 
 @app.route('/health')
 def health_check():
     try:
         # Try to connect to the target URL
-        response = requests.get(
+        response = http_session.get(
             TARGET_BASE_URL,
             timeout=5,
             verify=True
         )
-        logger.debug(f"Health check - Target URL: {TARGET_BASE_URL}")
-        logger.debug(f"Health check - Status code: {response.status_code}")
+        logger.debug("Health check - Target URL: %s", TARGET_BASE_URL)
+        logger.debug("Health check - Status code: %s", response.status_code)
 
         return Response(
             response='{"status": "healthy", "target_url": "' + TARGET_BASE_URL + '"}',
@@ -258,10 +313,7 @@ def resolve_variant(model_name: str) -> Optional[PseudoModel]:
     # Check for explicit tag match (model@tag)
     if config.split_token_model_name_label in model_name:
         base_model, label = model_name.split(config.split_token_model_name_label, 1)
-        for variant in config.variants.values():
-            if variant.label != label:
-                continue
-            print(f"{variant.model_regex=}")
+        for variant in config.variants_by_label.get(label, ()):
             if variant.model_re.search(base_model):
                 return PseudoModel(upstream_model_name=base_model, variant=variant)
     return None
@@ -276,10 +328,10 @@ def _handle_json_body_inplace(json_body) -> Optional[PseudoModel]:
     for param, value in cfg.variant.weak_defaults.items():
         if param not in json_body:
             json_body[param] = value
-            logger.debug(f"Applied weak default {param}={value}")
+            logger.debug("Applied weak default %s=%s", param, value)
 
     json_body['model'] = cfg.upstream_model_name
-    logger.info(f"Replaced pseudo model '{model_name}' with upstream model '{cfg.upstream_model_name}'")
+    logger.info("Replaced pseudo model '%s' with upstream model '%s'", model_name, cfg.upstream_model_name)
     return cfg
 
 
@@ -288,7 +340,7 @@ def _handle_messages(messages, append_string):
     if last_message.get('role') == 'user':
         if isinstance(last_message.get('content'), str):
             last_message['content'] += append_string
-            logger.debug(f"Appended to existing user message (string content): {append_string}")
+            logger.debug("Appended to existing user message (string content): %s", append_string)
         elif isinstance(last_message.get('content'), list):
             content_list = last_message['content']
             appended_to_existing_text_part = False
@@ -299,30 +351,30 @@ def _handle_messages(messages, append_string):
                 if isinstance(part, dict) and part.get('type') == 'text' and 'text' in part:
                     part['text'] += append_string
                     appended_to_existing_text_part = True
-                    logger.debug(f"Appended to last text part of user message content list: {append_string}")
+                    logger.debug("Appended to last text part of user message content list: %s", append_string)
                     break
 
             if not appended_to_existing_text_part:
                 # If no suitable text part was found (e.g. list of images, or empty list),
                 # add a new text part.
                 content_list.append({'type': 'text', 'text': append_string})
-                logger.debug(f"Added new text part to user message content list: {append_string}")
+                logger.debug("Added new text part to user message content list: %s", append_string)
         else:
             # Content is not a string or list (e.g., None or unexpected type)
             # Set the content to the append_string.
             original_content_type = type(last_message.get('content')).__name__
             last_message['content'] = append_string
-            logger.warning(f"Last user message content was '{original_content_type}'. Overwritten with new string content: {append_string}")
+            logger.warning("Last user message content was '%s'. Overwritten with new string content: %s", original_content_type, append_string)
     else:
         # Last message is not user: insert a new user message
         messages.append({"role": "user", "content": append_string})
-        logger.debug(f"Last message not 'user'. Inserted new user message with content: {append_string}")
+        logger.debug("Last message not 'user'. Inserted new user message with content: %s", append_string)
 
-def _handle_models_listing(decoded):
+def _handle_models_listing(content: bytes) -> bytes:
     try:
-        models_data = json.loads(decoded)
-    except json.JSONDecodeError as e:
-        logger.error(f"Failed to parse model list response: {e}")
+        models_data = _json_loads(content)
+    except ValueError as e:
+        logger.error("Failed to parse model list response: %s", e)
     # except Exception as e:
     #     logger.error(f"Error processing model list: {e}")
     else:
@@ -335,38 +387,41 @@ def _handle_models_listing(decoded):
                     extra.append(pseudo)
         # Merge pseudo models into the 'data' array if it exists
         models_data['data'].extend(extra)
-        decoded = json.dumps(models_data)
-    return decoded
+        content = _json_dumps(models_data)
+    return content
 
-def _filtering_for_pseudo_model(decoded, pseudo: PseudoModel):
+def _filtering_for_pseudo_model(content: bytes, pseudo: PseudoModel) -> bytes:
     # /v1/chat/completions on e.g. llamacpp has reasoning_content in response.
     # but /v1/completions for e.g. FIM, will have a trailing </think> tag for e.g. Qwen3
     # let's filter that out here.
+    think_re = _think_re(*pseudo.variant.thinking.tags)
     try:
-        resp_body = json.loads(decoded)
-    except json.JSONDecodeError as e:
-        logger.error(f"Failed to parse model list response: {e}")
+        resp_body = _json_loads(content)
+    except ValueError as e:
+        logger.warning("Response is not JSON (%s), stripping think tags from raw body", e)
+        return think_re.sub("", content.decode("utf-8", errors="replace")).encode("utf-8")
     if 'choices' in resp_body:
-        last = resp_body['choices'][-1]
-        if 'text' in last:
-            last['text'] = last['text'].lstrip('\n')
-            think_close = '</think>'
-            if last['text'].startswith(think_close):
-                last['text'] = last['text'][len(think_close):]
-            last['text'] = last['text'].lstrip('\n')
-        print(f"{last=}")
-        return json.dumps(resp_body)
+        for choice in resp_body['choices']:
+            if not isinstance(choice, dict):
+                continue
+            message = choice.get('message')
+            if isinstance(message, dict) and isinstance(message.get('content'), str):
+                message['content'] = think_re.sub("", message['content'])
+            if isinstance(choice.get('text'), str):
+                choice['text'] = think_re.sub("", choice['text']).lstrip('\n')
+        logger.debug("choices=%r", resp_body['choices'])
+        return _json_dumps(resp_body)
     else:
-        print(f"choices not in {resp_body=}")
-        return decoded
+        logger.debug("choices not in resp_body=%r", resp_body)
+        return content
 
 
-def _handle_non_streaming(filtered):
-    logger.debug(f"Non-streaming response content: {filtered}")
-    encoded = filtered.encode("utf-8")
+def _handle_non_streaming(body: bytes):
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Non-streaming response content: %s", body.decode("utf-8", errors="replace"))
     headers_to_exclude = {"content-length", "transfer-encoding"}
     return Response(
-        encoded,
+        body,
         status=g.api_response.status_code,
         headers=[(name, value) for name, value in g.api_response.headers.items() if name.lower() not in headers_to_exclude],
         content_type=g.api_response.headers.get("Content-Type", "application/json")
@@ -375,49 +430,35 @@ def _handle_non_streaming(filtered):
 
 def _handle_streaming(*, pseudo: PseudoModel):
     def generate_filtered_response():
-        client_disconnected = False
         try:
             # Conditional filtering based on enable_think_tag_filtering
             if pseudo is not None and pseudo.variant.thinking.do_strip:
-                buffer = StreamBuffer(*pseudo.variant.thinking.tags)
-                for chunk in g.api_response.iter_content(chunk_size=8192):
-                    # The act of trying to yield to a disconnected client will typically
-                    # raise GeneratorExit or a socket error, caught below.
-
-                    output = buffer.process_chunk(chunk)
-                    if output:
-                        logger.debug(f"Streaming chunk: {output.decode('utf-8', errors='replace')}")
-                        yield output
-
-                # After the loop, if the client is still considered connected, flush the buffer
-                # (client_disconnected flag will be true if the except block was hit)
-                if not client_disconnected:
-                    final_output = buffer.flush()
-                    if final_output:
-                        logger.debug(f"Final streaming chunk after loop: {final_output.decode('utf-8', errors='replace')}")
-                        yield final_output
+                start_tag, end_tag = (tag.encode("utf-8") for tag in pseudo.variant.thinking.tags)
+                chunks = g.api_response.iter_content(chunk_size=8192)
+                # The act of trying to yield to a disconnected client will typically
+                # raise GeneratorExit or a socket error, caught below.
+                for output in strip_think_stream(chunks, start_tag, end_tag):
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Streaming chunk: %s", output.decode('utf-8', errors='replace'))
+                    yield output
             else:
                 # No filtering: stream chunks directly
                 for chunk in g.api_response.iter_content(chunk_size=8192):
                     yield chunk
 
-
         except (GeneratorExit, ConnectionError, requests.exceptions.ChunkedEncodingError) as e:
             # Only log if it's not a GeneratorExit (which is a normal stream closure)
             if not isinstance(e, GeneratorExit):
-                logger.warning(f"Client disconnected or stream error during generation: {type(e).__name__} - {str(e)}")
-            client_disconnected = True
+                logger.warning("Client disconnected or stream error during generation: %s - %s", type(e).__name__, e)
             # Optionally, re-raise if specific handling is needed by Flask/Gunicorn,
             # but often just returning is enough to stop the generator.
             # For now, we'll just log and stop.
         except requests.exceptions.RequestException as e:
             # Catch other requests-related errors during streaming
-            logger.error(f"Requests exception during streaming: {type(e).__name__} - {str(e)}")
-            client_disconnected = True
+            logger.error("Requests exception during streaming: %s - %s", type(e).__name__, e)
         except Exception as e:
             # Catch any other unexpected errors during streaming
-            logger.error(f"Unexpected error during streaming: {type(e).__name__} - {str(e)}", exc_info=True)
-            client_disconnected = True
+            logger.error("Unexpected error during streaming: %s - %s", type(e).__name__, e, exc_info=True)
         # finally:
         #     # Ensure the downstream response is closed, especially if an error occurred.
         #     # The teardown_request will also attempt this, but good for safety here too.
@@ -426,8 +467,8 @@ def _handle_streaming(*, pseudo: PseudoModel):
         #         logger.debug("Downstream API response closed in generate_filtered_response finally block.")
 
     # Log response details
-    logger.debug(f"Response status: {g.api_response.status_code}")
-    logger.debug(f"Response headers: {dict(g.api_response.headers)}")
+    logger.debug("Response status: %s", g.api_response.status_code)
+    logger.debug("Response headers: %s", g.api_response.headers)
 
     return Response(
         stream_with_context(generate_filtered_response()),
@@ -454,34 +495,34 @@ def proxy(path):
         target_url += f"?{request.query_string.decode()}"
 
     # Log request details
-    logger.debug(f"Forwarding {request.method} request to: {target_url}")
-    logger.debug(f"Headers: {headers}")
+    logger.debug("Forwarding %s request to: %s", request.method, target_url)
+    logger.debug("Headers: %s", headers)
 
     pseudo = None
     try:
         # Get JSON body if present
         json_body = request.get_json(silent=True) if request.is_json else None
-        logger.debug(f"Request JSON body: {json_body}")
+        logger.debug("Request JSON body: %s", json_body)
 
         if json_body:
             pseudo = _handle_json_body_inplace(json_body)
 
         if pseudo:
-            logger.info(f"Using think tags for model '{pseudo.variant.name}': START='{pseudo.variant.thinking.tags[0]}', END='{pseudo.variant.thinking.tags[1]}'")
-            logger.info(f"Think tag filtering enabled: {pseudo.variant.thinking.do_strip} for model '{pseudo.variant.name}'")
+            logger.info("Using think tags for model '%s': START='%s', END='%s'", pseudo.variant.name, pseudo.variant.thinking.tags[0], pseudo.variant.thinking.tags[1])
+            logger.info("Think tag filtering enabled: %s for model '%s'", pseudo.variant.thinking.do_strip, pseudo.variant.name)
             append_string = pseudo.variant.inject_at_end
             if 'messages' not in json_body or not json_body['messages']:
                 # No messages: create a new user message with the string
                 json_body.setdefault('messages', [])
                 json_body['messages'].append({"role": "user", "content": append_string})
-                logger.debug(f"Created new user message with content: {append_string}")
+                logger.debug("Created new user message with content: %s", append_string)
             else:
                 # Find the last message to append to
                 if json_body['messages']: # Ensure messages list is not empty
                     _handle_messages(json_body['messages'], append_string)
                 else: # messages list is empty
                     json_body['messages'].append({"role": "user", "content": append_string})
-                    logger.debug(f"Messages list was empty. Created new user message with content: {append_string}")
+                    logger.debug("Messages list was empty. Created new user message with content: %s", append_string)
             if 'logit_bias' in json_body:
                 assert isinstance(json_body['logit_bias'], dict)
             else:
@@ -495,22 +536,22 @@ def proxy(path):
 
             if pseudo.upstream_model_name.startswith('llamacpp-') and isinstance(json_body.get('logit_bias'), dict):
                 json_body['logit_bias'] = [[k, v] for k, v in json_body['logit_bias'].items()]  # I think...
-                print(f"{json_body['logit_bias']=}")
+                logger.debug("json_body['logit_bias']=%r", json_body['logit_bias'])
 
         # Try to connect with a timeout
         try:
             # Store response in Flask's request context
-            g.api_response = requests.request(
+            g.api_response = http_session.request(
                 method=request.method,
                 url=target_url,
                 headers=headers,
-                json=json_body,
+                data=_json_dumps(json_body) if json_body is not None else None,
                 stream=True,
                 timeout=config.api_request_timeout,  # Timeout in seconds
                 verify=True  # Verify SSL certificates
             )
-            logger.debug(f"Connected to target URL: {target_url}")
-            logger.debug(f"Target response time: {g.api_response.elapsed.total_seconds()}s")
+            logger.debug("Connected to target URL: %s", target_url)
+            logger.debug("Target response time: %ss", g.api_response.elapsed.total_seconds())
         except requests.exceptions.Timeout:
             error_msg = f"Connection to {target_url} timed out"
             logger.error(error_msg)
@@ -539,8 +580,8 @@ def proxy(path):
         # For error responses, return them directly without streaming
         if g.api_response.status_code >= 400:
             error_content = g.api_response.content.decode('utf-8')
-            logger.error(f"Target server error: {g.api_response.status_code}")
-            logger.error(f"Error response: {error_content}")
+            logger.error("Target server error: %s", g.api_response.status_code)
+            logger.error("Error response: %s", error_content)
             return Response(
                 error_content,
                 status=g.api_response.status_code,
@@ -558,23 +599,20 @@ def proxy(path):
 
     # Check if response should be streamed
     is_stream = json_body.get('stream', False) if json_body else False
-    logger.debug(f"Stream mode: {is_stream}")
-    logger.debug(f"Psuedo: {pseudo}")
+    logger.debug("Stream mode: %s", is_stream)
+    logger.debug("Psuedo: %s", pseudo)
 
     if is_stream:
         return _handle_streaming(pseudo=pseudo)
     else:
         content = g.api_response.content
-        decoded = content.decode("utf-8", errors="replace")
-        print(f"{path=}")
-        print(f"{decoded=}")
+        logger.debug("path=%r", path)
         if path in ['models', 'v1/models']:
-            final = _handle_models_listing(decoded)
+            content = _handle_models_listing(content)
         elif pseudo is not None and pseudo.variant.thinking.do_strip:
-            final = _filtering_for_pseudo_model(decoded, pseudo=pseudo)
-        else:
-            final = decoded
-        return _handle_non_streaming(final)
+            content = _filtering_for_pseudo_model(content, pseudo=pseudo)
+        # otherwise the upstream bytes are passed through untouched
+        return _handle_non_streaming(content)
 
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5000)
@@ -1,5 +1,6 @@
+import logging
 import pytest
-from cot_proxy import app as flask_app
+from cot_proxy import app as flask_app, ThinkingConfig
 import os
 from unittest.mock import patch
 
@@ -26,14 +27,27 @@ def app():
 def client(app):
     """A test client for the app."""
     return app.test_client()
-  
+
+@pytest.fixture(autouse=True)
+def mocked_target_base(mocker):
+    """Point the proxy at a fake target URL; returned for building mock URLs."""
+    url = "http://fake-target/"
+    mocker.patch('cot_proxy.TARGET_BASE_URL', url)
+    return url
+
+@pytest.fixture(scope='module')
+def default_think_cfg():
+    """Thinking config stripping the default <think>...</think> tags."""
+    return ThinkingConfig(do_strip=True, tags=('<think>', '</think>'))
+
 @pytest.fixture
-def enable_debug(mocker):
-    """Enable DEBUG logging for the duration of the test."""
-    # Patch the DEBUG environment variable
-    mocker.patch.dict(os.environ, {"DEBUG": "true"}, clear=True)
-    # Optionally patch the module-level logger setup if needed
-    # (Not required if tests already use `caplog` and `DEBUG` is set globally)
+def enable_debug(caplog):
+    """Enable DEBUG logging for the duration of the test.
+
+    This is the only way tests raise the log level; all other tests run at the
+    level configured at import time and skip formatting of debug records.
+    """
+    caplog.set_level(logging.DEBUG, logger="cot_proxy")
     yield
 
 # You can add other shared fixtures here, for example,
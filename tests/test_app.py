@@ -192,4 +192,16 @@ def test_health_check_unhealthy_target_error_status(client, mocker):
     assert response.status_code == 200
     data = json.loads(response.data)
     assert data['status'] == 'healthy'
-    assert data['target_url'] == mocked_url
\ No newline at end of file
+    assert data['target_url'] == mocked_url
+
+
+def test_orjson_json_provider(app):
+    """Test the app uses the orjson-backed JSON provider."""
+    assert isinstance(app.json, cot_proxy.OrjsonProvider)
+    assert app.json.loads(app.json.dumps({"b": 1, "a": [1.5, None]})) == {"b": 1, "a": [1.5, None]}
+    assert app.json.dumps({1: "x"}) == '{"1":"x"}'
+    big = {"seed": 18446744073709551617, "neg": -9223372036854775809}
+    assert app.json.loads('{"seed": 18446744073709551617, "neg": -9223372036854775809}') == big
+    assert app.json.loads(app.json.dumps(big)) == big
+    # Documents orjson rejects are parsed by the stdlib json instead
+    assert app.json.loads('{"c": "hi \\ud83d", "n": 1e400}') == {"c": "hi \ud83d", "n": float("inf")}
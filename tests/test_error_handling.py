@@ -138,7 +138,7 @@ def test_proxy_target_returns_5xx_error(client, mocker, caplog):
 def test_proxy_request_exception_before_target_call(client, mocker, caplog):
     """
     Test 502 response if a RequestException occurs before/during the main request to target.
-    Example: Malformed URL constructed, or other issues within the `requests.request` call setup
+    Example: Malformed URL constructed, or other issues within the `http_session.request` call setup
     not covered by specific exceptions like Timeout, SSLError, ConnectionError.
     """
     mocked_target_url = "http://valid-looking-url/"
@@ -146,9 +146,9 @@ def test_proxy_request_exception_before_target_call(client, mocker, caplog):
     mocker.patch.dict(os.environ, {"TARGET_BASE_URL": mocked_target_url}, clear=True)
 
 
-    # Patch requests.request directly to raise a generic RequestException
-    # The URL for requests.request will be constructed using the (patched) cot_proxy.TARGET_BASE_URL
-    with patch('requests.request', side_effect=requests.exceptions.RequestException("Generic request problem")) as mock_req_call:
+    # Patch the proxy session's request method directly to raise a generic RequestException
+    # The URL for http_session.request will be constructed using the (patched) cot_proxy.TARGET_BASE_URL
+    with patch('cot_proxy.http_session.request', side_effect=requests.exceptions.RequestException("Generic request problem")) as mock_req_call:
         request_body = {"model": "test-generic-req-ex", "messages": [{"role": "user", "content": "Hello"}]}
         proxy_response = client.post("/v1/chat/completions", json=request_body) # Path is appended to TARGET_BASE_URL
 
@@ -158,7 +158,7 @@ def test_proxy_request_exception_before_target_call(client, mocker, caplog):
         # The error message in cot_proxy.py for this case is: f"Failed to forward request: {str(e)}"
         assert "Failed to forward request: Generic request problem" in data["error"]
         assert "Failed to forward request: Generic request problem" in caplog.text
-        mock_req_call.assert_called_once() # Ensure requests.request was attempted
+        mock_req_call.assert_called_once() # Ensure http_session.request was attempted
 
 def test_teardown_request_closes_api_response(mocker): # Removed client and app fixtures as they are not directly used for this simplified test
     """
@@ -1,6 +1,6 @@
 import pytest
 import logging
-from cot_proxy import convert_param_value, PARAM_TYPES
+from cot_proxy import convert_param_value, PARAM_TYPES, AppConfig, VariantConfig, resolve_variant
 
 # Test cases for successful conversions
 @pytest.mark.parametrize("key, value_str, expected_value", [
@@ -108,4 +108,32 @@ def test_convert_param_value_bool_specifics():
 def test_convert_param_value_unknown_key():
     """Test that an unknown key returns the value as a string without conversion attempt."""
     assert convert_param_value("new_unknown_parameter", "123") == "123"
-    assert convert_param_value("another_one", "true_string") == "true_string"
\ No newline at end of file
+    assert convert_param_value("another_one", "true_string") == "true_string"
+
+
+def test_resolve_variant_by_label(mocker):
+    """Test that resolve_variant picks the variant by label and checks its model regex."""
+    variants = {
+        "a": VariantConfig(name="a", label="fast", model_regex="^qwen"),
+        "b": VariantConfig(name="b", label="fast", model_regex="^llama"),
+        "c": VariantConfig(name="c", label="slow", model_regex="^llama"),
+    }
+    mocker.patch('cot_proxy.config', AppConfig(variants=variants))
+
+    pseudo = resolve_variant("llama-3@fast")
+    assert pseudo.upstream_model_name == "llama-3"
+    assert pseudo.variant.name == "b"
+    assert resolve_variant("llama-3@slow").variant.name == "c"
+    assert resolve_variant("mistral@fast") is None
+    assert resolve_variant("llama-3@unknown") is None
+    assert resolve_variant("llama-3") is None
+
+def test_variant_config_is_frozen():
+    """Test that variant configs cannot be mutated while serving requests."""
+    from pydantic import ValidationError
+    variant = VariantConfig(name="a", label="fast", model_regex="^qwen")
+    with pytest.raises(ValidationError):
+        variant.label = "slow"
+    with pytest.raises(ValidationError):
+        variant.thinking.do_strip = True
+    assert variant.model_re is variant.model_re
@@ -1,23 +1,30 @@
 import pytest
-import os
 import json
-import logging
 import responses
-from unittest.mock import patch
+from cot_proxy import PseudoModel, VariantConfig, ThinkingConfig
 
 # Default think tags from cot_proxy.py if no env vars are set
 DEFAULT_CODE_START_TAG = '<think>'
 DEFAULT_CODE_END_TAG = '</think>'
 
-@responses.activate
-def test_proxy_non_streaming_basic_get(client, mocker):
+@pytest.fixture(scope='module')
+def _module_rmock():
+    """One RequestsMock shared by every test in this module."""
+    with responses.RequestsMock(assert_all_requests_are_fired=False) as rsps:
+        yield rsps
+
+@pytest.fixture(autouse=True)
+def rmock(_module_rmock):
+    """The shared RequestsMock, with registrations and calls cleared after each test."""
+    yield _module_rmock
+    _module_rmock.reset()
+
+
+def test_proxy_non_streaming_basic_get(client, rmock, mocked_target_base):
     """Test basic non-streaming GET request forwarding."""
-    mocked_target_base = "http://fake-target-nonstream/"
-    mocker.patch('cot_proxy.TARGET_BASE_URL', mocked_target_base)
-    mocker.patch.dict(os.environ, {}, clear=True) # Clear env var so patched module var is used
 
     target_response_content = {"message": "GET success"}
-    responses.add(
+    rmock.add(
         responses.GET,
         f"{mocked_target_base}some/path?param1=value1",
         json=target_response_content,
@@ -33,60 +40,49 @@ def test_proxy_non_streaming_basic_get(client, mocker):
     # Content-Length might be different due to Flask test client or re-encoding, so usually not asserted directly unless critical.
 
     # Verify that the request to the target was made correctly
-    assert len(responses.calls) == 1
-    call = responses.calls[0]
+    assert len(rmock.calls) == 1
+    call = rmock.calls[0]
     assert call.request.method == "GET"
     assert call.request.url == f"{mocked_target_base}some/path?param1=value1"
     assert call.request.headers.get("X-Client-Header") == "ClientValue"
     assert "Host" not in call.request.headers # Host header should be excluded
 
-@responses.activate
-def test_proxy_non_streaming_post_json_body(client, mocker):
+def test_proxy_non_streaming_post_json_body(client, rmock, mocked_target_base):
     """Test non-streaming POST request with JSON body forwarding."""
-    mocked_target_base = "http://fake-target-nonstream/"
-    mocker.patch('cot_proxy.TARGET_BASE_URL', mocked_target_base)
-    mocker.patch.dict(os.environ, {}, clear=True)
 
     request_json_body = {"data": "sample_post_data", "model": "test-post-model"}
     target_response_content = {"reply": "POST received"}
 
-    # This will hold the JSON body received by the mocked target
-    payload_to_target = None
-    def request_callback(request):
-        nonlocal payload_to_target
-        payload_to_target = json.loads(request.body)
-        return (200, {}, json.dumps(target_response_content))
-
-    responses.add_callback(
+    rmock.add(
         responses.POST,
         f"{mocked_target_base}v1/post/endpoint",
-        callback=request_callback,
-        content_type="application/json"
+        json=target_response_content,
+        status=200
     )
 
     proxy_response = client.post("/v1/post/endpoint", json=request_json_body)
 
     assert proxy_response.status_code == 200
     assert proxy_response.json == target_response_content
-    assert payload_to_target is not None
+    assert len(rmock.calls) == 1
+    payload_to_target = json.loads(rmock.calls[0].request.body)
     assert payload_to_target == request_json_body
 
 
-@responses.activate
-def test_proxy_non_streaming_think_tag_removal_default_tags(client, mocker, caplog, enable_debug):
-    """Test non-streaming think tag removal with default code tags."""
-    caplog.set_level(logging.DEBUG)
-    mocked_target_base = "http://fake-target-nonstream/"
-    mocker.patch('cot_proxy.TARGET_BASE_URL', mocked_target_base)
-    mocker.patch.dict(os.environ, {
-        "LLM_PARAMS": "model=nonstream-model,enable_think_tag_filtering=true"
-    }, clear=True)
-    # Ensure module defaults are the code defaults for this test
-    # mocker.patch('cot_proxy.DEFAULT_THINK_START_TAG', DEFAULT_CODE_START_TAG)
-    # mocker.patch('cot_proxy.DEFAULT_THINK_END_TAG', DEFAULT_CODE_END_TAG)
-
-    raw_content_from_target = f"Visible {DEFAULT_CODE_START_TAG}secret thoughts{DEFAULT_CODE_END_TAG} content."
-    responses.add(
+@pytest.mark.parametrize("start_tag, end_tag, label", [
+    (DEFAULT_CODE_START_TAG, DEFAULT_CODE_END_TAG, "default"),
+    ("<llm_s>", "</llm_e>", "custom"),
+    ("<env_s>", "</env_e>", "env"),
+])
+def test_proxy_non_streaming_think_tag_removal(client, rmock, mocker, mocked_target_base, caplog, enable_debug, start_tag, end_tag, label):
+    """Test non-streaming think tag removal with the variant's configured tags."""
+    variant = VariantConfig(name=f"test-model-{label}", label=label, model_regex="test-model",
+                            thinking=ThinkingConfig(do_strip=True, tags=(start_tag, end_tag)))
+    mocker.patch('cot_proxy.resolve_variant',
+                 return_value=PseudoModel(upstream_model_name="test-model", variant=variant))
+
+    raw_content_from_target = f"Visible {start_tag}secret thoughts{end_tag} content."
+    rmock.add(
         responses.POST,
         f"{mocked_target_base}v1/chat/completions",
         body=raw_content_from_target,
@@ -94,93 +90,26 @@ def test_proxy_non_streaming_think_tag_removal_default_tags(client, mocker, capl
         content_type="application/json"
     )
 
-    request_body = {"model": "nonstream-model", "stream": False, "messages": [{"role": "user", "content": "Hello"}]}
+    request_body = {"model": f"test-model@{label}", "stream": False, "messages": [{"role": "user", "content": "Hello"}]}
     proxy_response = client.post("/v1/chat/completions", json=request_body)
 
     assert proxy_response.status_code == 200
     assert proxy_response.data.decode('utf-8') == "Visible  content."
 
-    expected_log = f"Using think tags for model 'nonstream-model': START='{DEFAULT_CODE_START_TAG}', END='{DEFAULT_CODE_END_TAG}'"
+    expected_log = f"Using think tags for model 'test-model-{label}': START='{start_tag}', END='{end_tag}'"
     assert expected_log in caplog.text
     assert "Non-streaming response content: Visible  content." in caplog.text
 
 
-@responses.activate
-def test_proxy_non_streaming_think_tag_removal_llm_params_tags(client, mocker, caplog):
-    """Test non-streaming think tag removal with tags from LLM_PARAMS."""
-    custom_start = "<llm_s>"
-    custom_end = "</llm_e>"
-    mocked_target_base = "http://fake-target-nonstream/"
-    mocker.patch('cot_proxy.TARGET_BASE_URL', mocked_target_base)
-    mocker.patch.dict(os.environ, {
-        "LLM_PARAMS": f"model=llm-param-model,think_tag_start={custom_start},think_tag_end={custom_end},enable_think_tag_filtering=true",
-    }, clear=True)
-
-    raw_content_from_target = f"Data {custom_start}hidden{custom_end} visible."
-    responses.add(
-        responses.POST,
-        f"{mocked_target_base}v1/chat/completions",
-        body=raw_content_from_target,
-        status=200,
-        content_type="application/json"
-    )
-
-    request_body = {"model": "llm-param-model", "stream": False, "messages": [{"role": "user", "content": "Hello"}]}
-    proxy_response = client.post("/v1/chat/completions", json=request_body)
-
-    assert proxy_response.status_code == 200
-    assert proxy_response.data.decode('utf-8') == "Data  visible."
-    expected_log = f"Using think tags for model 'llm-param-model': START='{custom_start}', END='{custom_end}'"
-    assert expected_log in caplog.text
-
-@responses.activate
-def test_proxy_non_streaming_think_tag_removal_global_env_tags(client, mocker, caplog):
-    """Test non-streaming think tag removal with global THINK_TAG/THINK_END_TAG."""
-    env_start = "<env_s>"
-    env_end = "</env_e>"
-    mocked_target_base = "http://fake-target-nonstream/"
-    mocker.patch('cot_proxy.TARGET_BASE_URL', mocked_target_base)
-    mocker.patch.dict(os.environ, {
-        "THINK_TAG": env_start,
-        "THINK_END_TAG": env_end,
-        "LLM_PARAMS": "model=global-env-model,enable_think_tag_filtering=true"
-    }, clear=True)
-    # Patch module-level defaults so the THINK_TAG env vars are picked up
-    # mocker.patch('cot_proxy.DEFAULT_THINK_START_TAG', env_start)
-    # mocker.patch('cot_proxy.DEFAULT_THINK_END_TAG', env_end)
-
-    raw_content_from_target = f"Prefix {env_start}thoughts{env_end} Suffix."
-    responses.add(
-        responses.POST,
-        f"{mocked_target_base}v1/chat/completions",
-        body=raw_content_from_target,
-        status=200,
-        content_type="application/json"
-    )
-
-    request_body = {"model": "global-env-model", "stream": False, "messages": [{"role": "user", "content": "Hello"}]}
-    proxy_response = client.post("/v1/chat/completions", json=request_body)
-
-    assert proxy_response.status_code == 200
-    assert proxy_response.data.decode('utf-8') == "Prefix  Suffix."
-    expected_log = f"Using think tags for model 'global-env-model': START='{env_start}', END='{env_end}'"
-    assert expected_log in caplog.text
-
-@responses.activate
-def test_proxy_non_streaming_no_stream_key_in_request(client, mocker, caplog, enable_debug):
+def test_proxy_non_streaming_no_stream_key_in_request(client, rmock, mocker, mocked_target_base, default_think_cfg, caplog, enable_debug):
     """Test non-streaming path is taken if 'stream' key is absent in JSON body."""
-    caplog.set_level(logging.DEBUG)
-    mocked_target_base = "http://fake-target-nonstream/"
-    mocker.patch('cot_proxy.TARGET_BASE_URL', mocked_target_base)
-    mocker.patch.dict(os.environ, {
-        "LLM_PARAMS": "model=no-stream-key-model,enable_think_tag_filtering=true"
-    }, clear=True)
-    # Ensure module defaults are the code defaults for this test
-    # mocker.patch('cot_proxy.DEFAULT_THINK_START_TAG', DEFAULT_CODE_START_TAG)
-    # mocker.patch('cot_proxy.DEFAULT_THINK_END_TAG', DEFAULT_CODE_END_TAG)
+    variant = VariantConfig(name="no-stream-key", label="strip", model_regex="test-model",
+                            thinking=default_think_cfg)
+    mocker.patch('cot_proxy.resolve_variant',
+                 return_value=PseudoModel(upstream_model_name="test-model", variant=variant))
 
     raw_content_from_target = f"Content {DEFAULT_CODE_START_TAG}stuff{DEFAULT_CODE_END_TAG} end."
-    responses.add(
+    rmock.add(
         responses.POST,
         f"{mocked_target_base}v1/chat/completions",
         body=raw_content_from_target,
@@ -189,7 +118,7 @@ def test_proxy_non_streaming_no_stream_key_in_request(client, mocker, caplog, en
     )
 
     # 'stream' key is missing, should default to non-streaming
-    request_body = {"model": "no-stream-key-model", "messages": [{"role": "user", "content": "Hello"}]}
+    request_body = {"model": "test-model@strip", "messages": [{"role": "user", "content": "Hello"}]}
     proxy_response = client.post("/v1/chat/completions", json=request_body)
 
     assert proxy_response.status_code == 200
@@ -199,21 +128,10 @@ def test_proxy_non_streaming_no_stream_key_in_request(client, mocker, caplog, en
     assert "Stream mode: False" in caplog.text
 
 
-@responses.activate
-def test_proxy_non_streaming_no_json_body(client, mocker, caplog, enable_debug):
+def test_proxy_non_streaming_no_json_body(client, rmock, mocked_target_base, caplog, enable_debug):
     """Test non-streaming path when request has no JSON body (e.g., simple GET)."""
-    caplog.set_level(logging.DEBUG)
-    mocked_target_base = "http://fake-target-nonstream/"
-    mocker.patch('cot_proxy.TARGET_BASE_URL', mocked_target_base)
-    mocker.patch.dict(os.environ, {
-        "LLM_PARAMS": "model=default,enable_think_tag_filtering=true" # For the second part of the test
-    }, clear=True)
-    # Ensure module defaults are the code defaults for this test
-    # mocker.patch('cot_proxy.DEFAULT_THINK_START_TAG', DEFAULT_CODE_START_TAG)
-    # mocker.patch('cot_proxy.DEFAULT_THINK_END_TAG', DEFAULT_CODE_END_TAG)
-
     target_response_body = "Simple GET response, no tags involved."
-    responses.add(
+    rmock.add(
         responses.GET,
         f"{mocked_target_base}simple/get/path",
         body=target_response_body,
@@ -230,11 +148,106 @@ def test_proxy_non_streaming_no_json_body(client, mocker, caplog, enable_debug):
     # is_stream is determined by json_body.get('stream', False) if json_body else False
     # So if no json_body, is_stream is False.
     assert "Stream mode: False" in caplog.text
-    # The non-streaming logic for think tag removal is only hit if json_body was present
-    # to determine effective_think_start_tag etc.
-    # If no json_body, the proxy function's main try block for requests.request is hit,
-    # then it checks g.api_response.status_code. If < 400, it proceeds to the
-    # `is_stream` check. If `is_stream` is false (due to no json_body),
-    # it decodes g.api_response.content.
-    # The `effective_think_start_tag` would be the global defaults in this case.
-    # So, if the response *did* contain default tags, they *would* be stripped.
+    # Without a JSON body no variant is resolved, so no think tag filtering applies:
+    # g.api_response.content is passed through as untouched bytes, and any tags
+    # in the response would be forwarded as-is.
+
+
+@pytest.mark.parametrize("choice_contents, expected", [
+    ([f"A{DEFAULT_CODE_START_TAG}x\ny{DEFAULT_CODE_END_TAG}B"], ["AB"]),
+    ([f"{DEFAULT_CODE_START_TAG}a{DEFAULT_CODE_END_TAG}X", f"{DEFAULT_CODE_START_TAG}b{DEFAULT_CODE_END_TAG}Y"], ["X", "Y"]),
+])
+def test_proxy_non_streaming_think_tag_removal_json_message(client, rmock, mocker, mocked_target_base, default_think_cfg,
+                                                            choice_contents, expected):
+    """Test think blocks are stripped from the message content of every choice of a JSON chat completion."""
+    variant = VariantConfig(name="strip", label="strip", model_regex="json-model",
+                            thinking=default_think_cfg)
+    mocker.patch('cot_proxy.resolve_variant',
+                 return_value=PseudoModel(upstream_model_name="json-model", variant=variant))
+
+    rmock.add(
+        responses.POST,
+        f"{mocked_target_base}v1/chat/completions",
+        json={"choices": [{"message": {"role": "assistant", "content": content}} for content in choice_contents]},
+        status=200,
+    )
+
+    request_body = {"model": "json-model@strip", "messages": [{"role": "user", "content": "Hello"}]}
+    proxy_response = client.post("/v1/chat/completions", json=request_body)
+
+    assert proxy_response.status_code == 200
+    assert [choice["message"]["content"] for choice in proxy_response.json["choices"]] == expected
+
+
+def test_proxy_non_streaming_dangling_end_tag_in_completion_text(client, rmock, mocker, mocked_target_base, default_think_cfg):
+    """Test a leading end tag (start tag consumed by the prompt) is removed from /v1/completions text."""
+    variant = VariantConfig(name="fim", label="fim", model_regex="fim-model",
+                            thinking=default_think_cfg)
+    mocker.patch('cot_proxy.resolve_variant',
+                 return_value=PseudoModel(upstream_model_name="fim-model", variant=variant))
+
+    rmock.add(
+        responses.POST,
+        f"{mocked_target_base}v1/completions",
+        json={"choices": [{"text": f"\n\n{DEFAULT_CODE_END_TAG}\n\nreturn 42"}]},
+        status=200,
+    )
+
+    proxy_response = client.post("/v1/completions", json={"model": "fim-model@fim", "prompt": "def f():"})
+
+    assert proxy_response.status_code == 200
+    assert proxy_response.json["choices"][0]["text"] == "return 42"
+
+
+def test_proxy_non_streaming_passthrough_keeps_raw_bytes(client, rmock, mocked_target_base):
+    """Test responses that need no filtering are forwarded byte for byte."""
+    raw_body = b"\x89PNG\r\n\x1a\n\xff\xfe not utf-8"
+    rmock.add(
+        responses.GET,
+        f"{mocked_target_base}files/image.png",
+        body=raw_body,
+        status=200,
+        content_type="image/png"
+    )
+
+    proxy_response = client.get("/files/image.png")
+
+    assert proxy_response.status_code == 200
+    assert proxy_response.data == raw_body
+    assert proxy_response.headers.get("Content-Type") == "image/png"
+
+
+def test_proxy_non_streaming_forwards_large_integers_exactly(client, rmock, mocked_target_base):
+    """Test integers outside the 64-bit range reach the target unchanged."""
+    rmock.add(
+        responses.POST,
+        f"{mocked_target_base}v1/chat/completions",
+        json={"choices": []},
+        status=200
+    )
+
+    proxy_response = client.post("/v1/chat/completions", data='{"model": "m", "seed": 18446744073709551617}',
+                                  content_type="application/json")
+
+    assert proxy_response.status_code == 200
+    payload_to_target = json.loads(rmock.calls[0].request.body)
+    assert payload_to_target["seed"] == 18446744073709551617
+
+
+def test_proxy_non_streaming_forwards_body_rejected_by_orjson(client, rmock, mocked_target_base):
+    """Test a body orjson cannot parse (lone surrogate escape) is still forwarded intact."""
+    rmock.add(
+        responses.POST,
+        f"{mocked_target_base}v1/chat/completions",
+        json={"choices": []},
+        status=200
+    )
+
+    proxy_response = client.post("/v1/chat/completions",
+                                  data='{"model": "m", "messages": [{"role": "user", "content": "hi \\ud83d"}]}',
+                                  content_type="application/json")
+
+    assert proxy_response.status_code == 200
+    assert rmock.calls[0].request.body is not None
+    payload_to_target = json.loads(rmock.calls[0].request.body)
+    assert payload_to_target["messages"][0]["content"] == "hi \ud83d"
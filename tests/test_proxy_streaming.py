@@ -4,6 +4,7 @@ import json
 import logging
 import responses
 from unittest.mock import patch, MagicMock
+from cot_proxy import PseudoModel, VariantConfig
 
 # Default think tags from cot_proxy.py if no env vars are set
 DEFAULT_CODE_START_TAG = '<think>'
@@ -15,10 +16,9 @@ def generate_streaming_chunks(content_parts, chunk_size=10):
     for i in range(0, len(full_content), chunk_size):
         yield full_content[i:i+chunk_size].encode('utf-8')
 
-# @responses.activate # Not needed if we patch requests.request
+# @responses.activate # Not needed if we patch http_session.request
 def test_proxy_streaming_basic_think_tag_removal(client, mocker, caplog, enable_debug):
     """Test basic streaming with default think tags."""
-    caplog.set_level(logging.DEBUG)
     mocked_target_base = "http://fake-target-stream/"
     mocker.patch('cot_proxy.TARGET_BASE_URL', mocked_target_base)
     mocker.patch.dict(os.environ, {
@@ -37,7 +37,7 @@ def test_proxy_streaming_basic_think_tag_removal(client, mocker, caplog, enable_
     mock_api_response.elapsed.total_seconds.return_value = 0.1
 
 
-    with patch('requests.request', return_value=mock_api_response) as mock_requests_call:
+    with patch('cot_proxy.http_session.request', return_value=mock_api_response) as mock_requests_call:
         request_body = {"model": "test-model", "stream": True, "messages": [{"role": "user", "content": "Hello stream"}]}
         response = client.post("/v1/chat/completions", json=request_body)
 
@@ -79,7 +79,7 @@ def test_proxy_streaming_llm_params_custom_tags(client, mocker, caplog):
     mock_api_response.elapsed = MagicMock()
     mock_api_response.elapsed.total_seconds.return_value = 0.1
 
-    with patch('requests.request', return_value=mock_api_response):
+    with patch('cot_proxy.http_session.request', return_value=mock_api_response):
         request_body = {"model": "my-streaming-model", "stream": True, "messages": [{"role": "user", "content": "Stream custom"}]}
         response = client.post("/v1/chat/completions", json=request_body)
 
@@ -119,7 +119,7 @@ def test_proxy_streaming_global_env_tags(client, mocker, caplog):
     mock_api_response.elapsed = MagicMock()
     mock_api_response.elapsed.total_seconds.return_value = 0.1
 
-    with patch('requests.request', return_value=mock_api_response):
+    with patch('cot_proxy.http_session.request', return_value=mock_api_response):
         request_body = {"model": "another-model", "stream": True, "messages": [{"role": "user", "content": "Stream env tags"}]}
         response = client.post("/v1/chat/completions", json=request_body)
 
@@ -161,7 +161,7 @@ def test_proxy_streaming_tag_split_across_chunks(client, mocker, caplog):
     mock_api_response.elapsed = MagicMock()
     mock_api_response.elapsed.total_seconds.return_value = 0.1
 
-    with patch('requests.request', return_value=mock_api_response):
+    with patch('cot_proxy.http_session.request', return_value=mock_api_response):
         request_body = {"model": "split-model", "stream": True, "messages": [{"role": "user", "content": "Stream split"}]}
         response = client.post("/v1/chat/completions", json=request_body)
 
@@ -175,7 +175,7 @@ def test_proxy_streaming_tag_split_across_chunks(client, mocker, caplog):
     expected_log = f"Using think tags for model 'split-model': START='{DEFAULT_CODE_START_TAG}', END='{DEFAULT_CODE_END_TAG}'"
     assert expected_log in caplog.text
 
-# @responses.activate # Not needed as we patch requests.request
+# @responses.activate # Not needed as we patch http_session.request
 def test_proxy_streaming_client_disconnect(client, mocker, caplog):
     """
     Test handling of client disconnection during streaming.
@@ -202,7 +202,7 @@ def test_proxy_streaming_client_disconnect(client, mocker, caplog):
     mock_api_response.elapsed.total_seconds.return_value = 0.1
 
 
-    with patch('requests.request', return_value=mock_api_response) as mock_requests_call:
+    with patch('cot_proxy.http_session.request', return_value=mock_api_response) as mock_requests_call:
         request_body = {"model": "disconnect-model", "stream": True, "messages": [{"role": "user", "content": "Stream disconnect"}]}
 
         # Make the request
@@ -222,3 +222,35 @@ def test_proxy_streaming_client_disconnect(client, mocker, caplog):
 # In cot_proxy.py, if g.api_response.status_code >= 400, it returns non-streamed error.
 # So, streaming tests should only cover cases where target initially returns 2xx.
 # This is implicitly handled because if target gave 4xx, it wouldn't reach streaming logic.
+
+
+def test_proxy_streaming_think_tag_removal_resolved_variant(client, mocker, mocked_target_base, default_think_cfg, caplog, enable_debug):
+    """Test streaming think tag removal through the client for a variant with do_strip enabled."""
+    variant = VariantConfig(name="stream-strip", label="strip", model_regex="test-model",
+                            thinking=default_think_cfg)
+    mocker.patch('cot_proxy.resolve_variant',
+                 return_value=PseudoModel(upstream_model_name="test-model", variant=variant))
+
+    target_response_parts = ["This is ", DEFAULT_CODE_START_TAG, "some thoughts", DEFAULT_CODE_END_TAG,
+                             " a stream. ", DEFAULT_CODE_START_TAG, "cut off by max_tokens"]
+
+    mock_api_response = MagicMock()
+    mock_api_response.iter_content.return_value = generate_streaming_chunks(target_response_parts, chunk_size=5)
+    mock_api_response.status_code = 200
+    mock_api_response.headers = {'Content-Type': 'text/event-stream'}
+
+    with patch('cot_proxy.http_session.request', return_value=mock_api_response) as mock_requests_call:
+        request_body = {"model": "test-model@strip", "stream": True, "messages": [{"role": "user", "content": "Hello stream"}]}
+        response = client.post("/v1/chat/completions", json=request_body)
+
+        assert response.status_code == 200
+        assert response.is_streamed
+        # The closed block is removed, the unterminated one is passed through as-is
+        assert response.data == f"This is  a stream. {DEFAULT_CODE_START_TAG}cut off by max_tokens".encode('utf-8')
+
+        _, kwargs = mock_requests_call.call_args
+        assert kwargs.get('url') == f"{mocked_target_base}v1/chat/completions"
+        assert kwargs.get('stream') is True
+        assert json.loads(kwargs.get('data'))["model"] == "test-model"
+
+    assert "Streaming chunk" in caplog.text
@@ -0,0 +1,47 @@
+import pytest
+from cot_proxy import strip_think_stream
+
+# Default tags for most tests, can be overridden
+DEFAULT_START_TAG = "<think>"
+DEFAULT_END_TAG = "</think>"
+
+def _strip(chunks, start=DEFAULT_START_TAG.encode(), end=DEFAULT_END_TAG.encode()):
+    return b"".join(strip_think_stream(chunks, start, end))
+
+@pytest.mark.parametrize("chunks, expected", [
+    ([b"This is a simple chunk."], b"This is a simple chunk."),
+    ([b"Hello <think>some thoughts</think> world!"], b"Hello  world!"),
+    ([b"Hello <th", b"ink>some thoughts</th", b"ink> world!"], b"Hello  world!"),
+    ([b"A<think>1</think>B<think>2</think>C"], b"ABC"),
+    ([b"Text before <thi", b"nk>thought</think> and after."], b"Text before  and after."),
+    ([b"<", b"t", b"h", b"i", b"n", b"k", b">x<", b"/think", b">y"], b"y"),
+    ([b"<think>outer<think>inner</think>outer_end</think>"], b"outer_end</think>"),
+    ([b"</think>"], b"</think>"),
+    ([b"Visible <think>unterminated thoughts"], b"Visible <think>unterminated thoughts"),
+    ([b"Visible <thi", b"nk>unterminated </th", b"in"], b"Visible <think>unterminated </thin"),
+    ([], b""),
+])
+def test_strip_think_stream(chunks, expected):
+    assert _strip(chunks) == expected
+
+def test_strip_think_stream_custom_tags():
+    chunks = [b"Data <custom_start>sec", b"ret</custom_end> more data"]
+    assert _strip(chunks, b"<custom_start>", b"</custom_end>") == b"Data  more data"
+
+def test_strip_think_stream_multibyte_split_across_chunks():
+    content = "ข้อมูล <คิด>ความคิดเห็น</คิด> เพิ่มเติม".encode("utf-8")
+    chunks = [content[i:i + 5] for i in range(0, len(content), 5)]
+    assert _strip(chunks, "<คิด>".encode(), "</คิด>".encode()) == "ข้อมูล  เพิ่มเติม".encode("utf-8")
+
+def test_strip_think_stream_holds_back_only_partial_tag():
+    gen = strip_think_stream(iter([b"a" * 20, b"<think>hidden" + b"b" * 100]), b"<think>", b"</think>")
+    # Everything but a possible partial start tag is emitted from the first chunk
+    assert next(gen) == b"a" * 14
+    assert next(gen) == b"a" * 6
+    # The block never closes, so it is emitted unchanged at the end of the input
+    assert list(gen) == [b"<think>hidden" + b"b" * 100]
+
+def test_strip_think_stream_unterminated_block_keeps_sse_framing():
+    events = [b'data: {"c":"<think>"}\n\n', b'data: {"c":"hmm"}\n\n',
+              b'data: {"finish_reason":"length"}\n\n', b'data: [DONE]\n\n']
+    assert _strip(events) == b"".join(events)